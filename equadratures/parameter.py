@@ -217,7 +217,6 @@ class Parameter(object):
                 V = [1.0]
         else:
             D,V = np.linalg.eig(self.get_jacobi_matrix(order))
-            V = np.mat(V) # convert to matrix
             i = np.argsort(D) # get the sorted indices
             i = np.array(i) # convert to array
             V = V[:,i]
@@ -269,45 +268,74 @@ class Parameter(object):
             Order up to which the orthogonal polynomial must be obtained.
         """
         if order is None:
-            order = self.order + 1
-        else:
-            order = order + 1
-        gridPoints = np.asarray(points).copy()
-        ab = self.get_recurrence_coefficients(order)
-        if (any(gridPoints) < self.bounds[0]) or (any(gridPoints) > self.bounds[1]):
-            for r in range(0, len(gridPoints)):
-                gridPoints[r] = (gridPoints[r] - self.bounds[0]) / (self.bounds[1] - self.bounds[0])
-
-        orthopoly = np.zeros((order, len(gridPoints)))  # create a matrix full of zeros
-        derivative_orthopoly = np.zeros((order, len(gridPoints)))
-        dderivative_orthopoly = np.zeros((order, len(gridPoints)))
-
-        # Convert the grid points to a numpy array -- simplfy life!
-        gridPointsII = np.zeros((len(gridPoints), 1))
-        for u in range(0, len(gridPoints)):
-            gridPointsII[u, 0] = gridPoints[u]
-        orthopoly[0, :] = 1.0
-
-        # Cases
-        if order == 1:  # CHANGED 2/2/18
-            return orthopoly, derivative_orthopoly, dderivative_orthopoly
-        orthopoly[1, :] = ((gridPointsII[:, 0] - ab[0, 0]) * orthopoly[0, :]) * (1.0) / (1.0 * np.sqrt(ab[1, 1]))
-        derivative_orthopoly[1, :] = orthopoly[0, :] / (np.sqrt(ab[1, 1]))
-        if order == 2:  # CHANGED 2/2/18
-            return orthopoly, derivative_orthopoly, dderivative_orthopoly
+            order = self.order
+        points = np.reshape(np.asarray(points, dtype=np.float64), (-1, 1))
+        orthopoly, derivative_orthopoly, dderivative_orthopoly = Parameter.batch_get_orthogonal_polynomial([self], points, [order], \
+                derivative_order=2)
+        return orthopoly[0], derivative_orthopoly[0], dderivative_orthopoly[0]
+    def _get_scaled_points(self, points):
+        """
+        Private function that applies to points the scaling used when evaluating the orthogonal polynomials; points are mapped
+        onto [0, 1] by the bounds of the parameter when the check below is triggered.
 
-        if order >= 3:  # CHANGED 2/2/18
-            for u in range(2, order):  # CHANGED 2/2/18
-                # Three-term recurrence rule in action!
-                orthopoly[u, :] = (((gridPointsII[:, 0] - ab[u - 1, 0]) * orthopoly[u - 1, :]) - np.sqrt(
-                    ab[u - 1, 1]) * orthopoly[u - 2, :]) / (1.0 * np.sqrt(ab[u, 1]))
-            for u in range(2, order):  # CHANGED 2/2/18
-                # Four-term recurrence formula for derivatives of orthogonal polynomials!
-                derivative_orthopoly[u,:] = ( ((gridPointsII[:,0] - ab[u-1,0]) * derivative_orthopoly[u-1,:]) - ( np.sqrt(ab[u-1,1]) * derivative_orthopoly[u-2,:] ) +  orthopoly[u-1,:]   )/(1.0 * np.sqrt(ab[u,1]))
-            for u in range(2,order):
-                # Four-term recurrence formula for second derivatives of orthogonal polynomials!
-                dderivative_orthopoly[u,:] = ( ((gridPointsII[:,0] - ab[u-1,0]) * dderivative_orthopoly[u-1,:]) - ( np.sqrt(ab[u-1,1]) * dderivative_orthopoly[u-2,:] ) +  2.0 * derivative_orthopoly[u-1,:]   )/(1.0 * np.sqrt(ab[u,1]))
+        :param Parameter self:
+            An instance of the Parameter object.
+        :param numpy.ndarray points:
+            Points at which the orthogonal polynomial must be evaluated.
+        :return:
+            A numpy.ndarray of scaled points, of the same shape as points.
+        """
+        gridPoints = np.array(points, dtype=np.float64)
+        if (np.any(gridPoints) < self.bounds[0]) or (np.any(gridPoints) > self.bounds[1]):
+            gridPoints = (gridPoints - self.bounds[0]) / (self.bounds[1] - self.bounds[0])
+        return gridPoints
+    @staticmethod
+    def batch_get_orthogonal_polynomial(parameters, points, orders, derivative_order=0):
+        """
+        Evaluates the univariate orthogonal polynomials of several parameters at once. The three-term recurrence is carried out
+        simultaneously over all the parameters and points, yielding one contiguous array instead of one array per parameter.
 
+        :param list parameters:
+            A list of d instances of the Parameter object.
+        :param numpy.ndarray points:
+            An ndarray with shape (number_of_observations, d); column i holds the points for parameters[i].
+        :param numpy.ndarray orders:
+            An integer array of length d with the order up to which the i-th orthogonal polynomial must be obtained.
+        :param int derivative_order:
+            Set to 1 to also compute first derivatives, or 2 to compute first and second derivatives.
+        :return:
+            A tuple with the orthogonal polynomials and their first and second derivatives, each a numpy.ndarray of shape
+            (d, max(orders) + 1, number_of_observations); derivatives that are not requested are returned as None. Rows beyond
+            orders[i] of the i-th parameter are not meaningful.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        dimensions = len(parameters)
+        orders = np.asarray(orders, dtype=int)
+        order = int(orders.max()) + 1
+        no_of_points = points.shape[0]
+        gridPoints = np.empty((dimensions, no_of_points))
+        ab = np.zeros((dimensions, order, 2))
+        ab[:, :, 1] = 1.0
+        for i in range(0, dimensions):
+            gridPoints[i, :] = parameters[i]._get_scaled_points(points[:, i])
+            ab[i, 0:orders[i] + 1, :] = parameters[i].get_recurrence_coefficients(int(orders[i]) + 1)[0:orders[i] + 1, :]
+        a = ab[:, :, 0:1]
+        sqrt_b = np.sqrt(ab[:, :, 1:2])
+        orthopoly = np.empty((dimensions, order, no_of_points))
+        derivative_orthopoly = np.zeros((dimensions, order, no_of_points)) if derivative_order >= 1 else None
+        dderivative_orthopoly = np.zeros((dimensions, order, no_of_points)) if derivative_order >= 2 else None
+        orthopoly[:, 0, :] = 1.0
+        if order >= 2:
+            orthopoly[:, 1, :] = ((gridPoints - a[:, 0]) * orthopoly[:, 0, :]) * (1.0) / (1.0 * sqrt_b[:, 1])
+            if derivative_orthopoly is not None:
+                derivative_orthopoly[:, 1, :] = orthopoly[:, 0, :] / sqrt_b[:, 1]
+        for u in range(2, order):
+            # Three-term recurrence rule, over every parameter at once
+            orthopoly[:, u, :] = (((gridPoints - a[:, u - 1]) * orthopoly[:, u - 1, :]) - sqrt_b[:, u - 1] * orthopoly[:, u - 2, :]) / (1.0 * sqrt_b[:, u])
+            if derivative_orthopoly is not None:
+                derivative_orthopoly[:, u, :] = ( ((gridPoints - a[:, u - 1]) * derivative_orthopoly[:, u - 1, :]) - ( sqrt_b[:, u - 1] * derivative_orthopoly[:, u - 2, :] ) + orthopoly[:, u - 1, :] ) / (1.0 * sqrt_b[:, u])
+            if dderivative_orthopoly is not None:
+                dderivative_orthopoly[:, u, :] = ( ((gridPoints - a[:, u - 1]) * dderivative_orthopoly[:, u - 1, :]) - ( sqrt_b[:, u - 1] * dderivative_orthopoly[:, u - 2, :] ) + 2.0 * derivative_orthopoly[:, u - 1, :] ) / (1.0 * sqrt_b[:, u])
         return orthopoly, derivative_orthopoly, dderivative_orthopoly
     def _get_local_quadrature(self, order=None, ab=None):
         """
@@ -355,7 +383,6 @@ def get_local_quadrature(self, order=None, ab=None):
     else:
         # Compute eigenvalues & eigenvectors of Jacobi matrix
         D,V = np.linalg.eig(JacobiMat)
-        V = np.mat(V) # convert to matrix
         local_points = np.sort(D) # sort by the eigenvalues
         i = np.argsort(D) # get the sorted indices
         i = np.array(i) # convert to array
@@ -7,8 +7,20 @@ from equadratures.subsampling import Subsampling
 from equadratures.quadrature import Quadrature
 import scipy.stats as st
 import numpy as np
-from copy import deepcopy
+try:
+    from numba import njit, prange
+    try:
+        from numba.core.errors import NumbaError
+    except ImportError:
+        from numba.errors import NumbaError
+    numba_imported = True
+except ImportError:
+    numba_imported = False
+    prange = range
 MAXIMUM_ORDER_FOR_STATS = 8
+POLYFIT_BLOCK_SIZE = 4096
+CACHE_BLOCK_FLOATS = 32768
+CACHE_BLOCK_MIN_POINTS = 256
 class Poly(object):
     """
     Definition of a polynomial object.
@@ -20,7 +32,7 @@ class Poly(object):
     :param dict sampling_args: Optional arguments centered around the specific sampling strategy.
 
             :string mesh: Avaliable options are: ``monte-carlo``, ``sparse-grid``, ``tensor-grid``, ``induced``, or ``user-defined``. Note that when the ``sparse-grid`` option is invoked, the sparse pseudospectral approximation method [1] is the adopted. One can think of this as being the correct way to use sparse grids in the context of polynomial chaos [2] techniques.
-            :string subsampling-algorithm: The ``subsampling-algorithm`` input refers to the optimisation technique for subsampling. In the aforementioned four sampling strategies, we generate a logarithm factor of samples above the required amount and prune down the samples using an optimisation technique (see [1]). Existing optimisation strategies include: ``qr``, ``lu``, ``svd``, ``newton``. These refer to QR with column pivoting [2], LU with row pivoting [3], singular value decomposition with subset selection [2] and a convex relaxation via Newton's method for determinant maximization [4]. Note that if the ``tensor-grid`` option is selected, then subsampling will depend on whether the Basis argument is a total order index set, hyperbolic basis or a tensor order index set.
+            :string subsampling-algorithm: The ``subsampling-algorithm`` input refers to the optimisation technique for subsampling. In the aforementioned four sampling strategies, we generate a logarithm factor of samples above the required amount and prune down the samples using an optimisation technique (see [1]). Existing optimisation strategies include: ``qr``, ``randomized-qr``, ``lu``, ``svd``, ``newton``. These refer to QR with column pivoting [2], randomized blocked QR with column pivoting, LU with row pivoting [3], singular value decomposition with subset selection [2] and a convex relaxation via Newton's method for determinant maximization [4]. Note that if the ``tensor-grid`` option is selected, then subsampling will depend on whether the Basis argument is a total order index set, hyperbolic basis or a tensor order index set.
             :float sampling-ratio: Denotes the extent of undersampling or oversampling required. For values equal to unity (default), the number of rows and columns of the associated Vandermonde-type matrix are equal.
             :numpy.ndarray sample-points: A numpy ndarray with shape (number_of_observations, dimensions) that corresponds to a set of sample points over the parameter space.
             :numpy.ndarray sample-outputs: A numpy ndarray with shape (number_of_observations, 1) that corresponds to model evaluations at the sample points. Note that if ``sample-points`` is provided as an input, then the code expects ``sample-outputs`` too.
@@ -71,10 +83,10 @@ class Poly(object):
         self.sampling_args = sampling_args
         self.solver_args = solver_args
         self.dimensions = len(parameters)
-        self.orders = []
         self.gradient_flag = 0
-        for i in range(0, self.dimensions):
-            self.orders.append(self.parameters[i].order)
+        self.parameters_order = np.fromiter((parameter.order for parameter in self.parameters), dtype=np.int64, \
+                count=self.dimensions)
+        self.orders = self.parameters_order.tolist()
         if not self.basis.orders :
             self.basis.set_orders(self.orders)
         # Initialize some default values!
@@ -83,8 +95,14 @@ class Poly(object):
         self.subsampling_algorithm_name = None
         self.sampling_ratio = 1.0
         self.statistics_object = None
-        self.parameters_order = [ parameter.order for parameter in self.parameters]
-        self.highest_order = np.max(self.parameters_order)
+        self._statistics_key = None
+        self._quadrature_poly = None
+        self._quadrature_poly_basis = None
+        self._statistics_poly = None
+        self._statistics_poly_basis = None
+        self._basis_elements = None
+        self._quadrature_dirty = True
+        self.highest_order = int(self.parameters_order.max())
         if self.method is not None:
             if self.method == 'numerical-integration' or self.method == 'integration':
                 self.mesh = self.basis.basis_type
@@ -119,7 +137,9 @@ class Poly(object):
             An instance of the Poly object.
         """
         self.parameters = parameters
-        self._set_points_and_weights()
+        self._quadrature_poly = None
+        self._statistics_poly = None
+        self._quadrature_dirty = True
     def get_parameters(self):
         """
         Returns the list of parameters
@@ -149,8 +169,8 @@ class Poly(object):
                 added = added + added_new
         if self.statistics_object is not None:
             mean_value, var_value = self.get_mean_and_variance()
-            X = self.get_points()
-            y_eval = self.get_polyfit(X)
+            self._ensure_quadrature()
+            y_eval = np.dot(self._get_quadrature_poly().T, self.coefficients.reshape(len(self.coefficients), 1))
             y_valid = self._model_evaluations
             a,b,r,_,_ = st.linregress(y_eval.flatten(),y_valid.flatten())
             r2 = np.round(r**2, 3)
@@ -192,26 +212,88 @@ class Poly(object):
         :param Poly self:
             An instance of the Poly object.
         """
+        self._quadrature_dirty = False
         self.quadrature = Quadrature(parameters=self.parameters, basis=self.basis, \
                         points=self.inputs, mesh=self.mesh)
         quadrature_points, quadrature_weights = self.quadrature.get_points_and_weights()
         if self.subsampling_algorithm_name is not None:
             P = self.get_poly(quadrature_points)
-            W = np.mat( np.diag(np.sqrt(quadrature_weights)))
-            A = W * P.T
+            A = _wscale(P.T, np.sqrt(quadrature_weights))
             self.A = A
             mm, nn = A.shape
             m_refined = int(np.round(self.sampling_ratio * nn))
             z = self.subsampling_algorithm_function(A, m_refined)
             self._quadrature_points = quadrature_points[z,:]
             self._quadrature_weights =  quadrature_weights[z] / np.sum(quadrature_weights[z])
+            self._sqrt_quadrature_weights = np.sqrt(self._quadrature_weights).reshape(-1, 1)
+            self._quadrature_poly = P[:, z]
+            self._quadrature_poly_basis = self.basis.elements
         else:
             self._quadrature_points = quadrature_points
             self._quadrature_weights = quadrature_weights
-            P = self.get_poly(quadrature_points)
-            W = np.mat( np.diag(np.sqrt(quadrature_weights)))
-            A = W * P.T
+            self._sqrt_quadrature_weights = np.sqrt(quadrature_weights).reshape(-1, 1)
+            self._quadrature_poly = None
+            P = self._get_quadrature_poly()
+            A = _wscale(P.T, self._sqrt_quadrature_weights)
             self.A = A
+    def _ensure_quadrature(self):
+        """
+        Private function that recomputes the quadrature points and weights only if they have been invalidated. They are
+        invalidated on construction, by _set_parameters, and when _set_coefficients falls back to least squares on the
+        inputs without NaN model evaluations; code that changes the inputs or mesh in any other way must set _quadrature_dirty.
+
+        :param Poly self:
+            An instance of the Poly object.
+        """
+        if self._quadrature_dirty:
+            self._set_points_and_weights()
+    def _get_quadrature_poly(self):
+        """
+        Private function that returns get_poly evaluated at the quadrature points. The matrix is computed once and reused
+        across _set_points_and_weights, _set_coefficients and _set_statistics; it is recomputed when the quadrature points
+        are reset or basis.elements is reassigned.
+
+        :param Poly self:
+            An instance of the Poly object.
+        """
+        if self._quadrature_poly is None or self._quadrature_poly_basis is not self.basis.elements:
+            self._quadrature_poly = self.get_poly(self._quadrature_points)
+            self._quadrature_poly_basis = self.basis.elements
+        return self._quadrature_poly
+    def _get_statistics_poly(self, quad_pts):
+        """
+        Private function that returns get_poly evaluated at the tensor grid used by _set_statistics. The grid depends only
+        on the parameters, so the matrix is kept until the parameters are reset or basis.elements is reassigned.
+
+        :param Poly self:
+            An instance of the Poly object.
+        :param numpy.ndarray quad_pts:
+            The tensor grid quadrature points.
+        """
+        if self._statistics_poly is None or self._statistics_poly_basis is not self.basis.elements:
+            self._statistics_poly = self.get_poly(quad_pts)
+            self._statistics_poly_basis = self.basis.elements
+        return self._statistics_poly
+    def _get_basis_int(self, basis=None):
+        """
+        Private function that returns a multi-index set as an integer array, along with its highest order in each dimension.
+        For the elements of the Poly's own basis, both are computed once and reused until basis.elements is reassigned.
+
+        :param Poly self:
+            An instance of the Poly object.
+        :param numpy.ndarray basis:
+            A multi-index set of shape (cardinality, dimensions); defaults to the elements of the Poly's basis.
+        :return:
+            A tuple of the integer multi-index set and a numpy.ndarray of shape (dimensions,) with the highest order in each dimension.
+        """
+        if basis is not None and basis is not self.basis.elements:
+            basis_int = basis.astype(np.intp)
+            return basis_int, basis_int.max(axis=0)
+        if self._basis_elements is not self.basis.elements:
+            self._basis_int = self.basis.elements.astype(np.intp)
+            self._basis_max = self._basis_int.max(axis=0)
+            self._basis_elements = self.basis.elements
+        return self._basis_int, self._basis_max
     def get_model_evaluations(self):
         """
         Returns the points at which the model was evaluated at.
@@ -252,17 +334,24 @@ class Poly(object):
         return self.statistics_object.get_skewness(), self.statistics_object.get_kurtosis()
     def _set_statistics(self):
         """
-        Private method that is used withn the statistics routines.
+        Private method that is used withn the statistics routines. The Statistics object is rebuilt only when the
+        coefficients or the highest order have changed since it was last constructed. Note that quad_pts, quad_wts and
+        poly_vandermonde_matrix are passed to Statistics by reference (it does not copy or modify them), and the
+        Vandermonde-type matrix is computed once and kept on the Poly.
 
         """
+        statistics_key = (id(self.coefficients), self.highest_order)
+        if self.statistics_object is not None and self._statistics_key != statistics_key:
+            self.statistics_object = None
         if self.statistics_object is None:
+            self._statistics_key = statistics_key
             if self.method != 'numerical-integration' and self.dimensions <= 6 and self.highest_order <= MAXIMUM_ORDER_FOR_STATS:
-                quad = Quadrature(parameters=self.parameters, basis=Basis('tensor-grid', orders= np.array(self.parameters_order) + 1), \
+                quad = Quadrature(parameters=self.parameters, basis=Basis('tensor-grid', orders= self.parameters_order + 1), \
                     mesh='tensor-grid', points=None)
                 quad_pts, quad_wts = quad.get_points_and_weights()
-                poly_vandermonde_matrix = self.get_poly(quad_pts)
+                poly_vandermonde_matrix = self._get_statistics_poly(quad_pts)
             else:
-                poly_vandermonde_matrix = self.get_poly(self._quadrature_points)
+                poly_vandermonde_matrix = self._get_quadrature_poly()
                 quad_pts, quad_wts = self.get_points_and_weights()
 
             if self.highest_order <= MAXIMUM_ORDER_FOR_STATS:
@@ -336,6 +425,7 @@ class Poly(object):
         :param callable model_grads:
             The gradient of the function that needs to be approximated. In the absence of a callable gradient function, the input can be a matrix of gradient evaluations at the quadrature points.
         """
+        self._ensure_quadrature()
         if (model is None) and (self.outputs is not None):
             self._model_evaluations = self.outputs
         else:
@@ -353,15 +443,10 @@ class Poly(object):
                 else:
                     grad_values = model_grads
                 p, q = grad_values.shape
-                self._gradient_evaluations = np.zeros((p*q,1))
-                W = np.diag(np.sqrt(self._quadrature_weights))
-                counter = 0
-                for j in range(0,q):
-                    for i in range(0,p):
-                        self._gradient_evaluations[counter] = W[i,i] * grad_values[i,j]
-                        counter = counter + 1
+                self._gradient_evaluations = _wscale(grad_values, self._sqrt_quadrature_weights).reshape(p*q, 1, order='F')
                 del grad_values
         self.statistics_object = None
+        self._statistics_key = None
         self._set_coefficients()
     def _set_coefficients(self, user_defined_coefficients=None):
         """
@@ -378,12 +463,16 @@ class Poly(object):
         if user_defined_coefficients is not None:
             self.coefficients = user_defined_coefficients
             return
-        indices_with_nans = np.argwhere(np.isnan(self._model_evaluations))[:,0]
-        if len(indices_with_nans) is not 0:
-            print('WARNING: One or more of your model evaluations have resulted in an NaN. We found '+str(len(indices_with_nans))+' NaNs out of '+str(len(self._model_evaluations))+'.')
+        self._ensure_quadrature()
+        nan_mask = np.isnan(self._model_evaluations)
+        if nan_mask.ndim > 1:
+            nan_mask = nan_mask.any(axis=1)
+        number_of_nans = int(np.sum(nan_mask))
+        if number_of_nans != 0:
+            print('WARNING: One or more of your model evaluations have resulted in an NaN. We found '+str(number_of_nans)+' NaNs out of '+str(len(self._model_evaluations))+'.')
             print('The code will now use a least-squares technique that will ignore input-output pairs of your model that have NaNs. This will likely compromise computed statistics.')
-            self.inputs = np.delete(self._quadrature_points, indices_with_nans, axis=0)
-            self.outputs = np.delete(self._model_evaluations, indices_with_nans, axis=0)
+            self.inputs = self._quadrature_points[~nan_mask]
+            self.outputs = self._model_evaluations[~nan_mask]
             self.subsampling_algorithm_name = None
             number_of_basis_to_prune_down = self.basis.cardinality - len(self.outputs)
             if number_of_basis_to_prune_down > 0:
@@ -391,21 +480,25 @@ class Poly(object):
             self.method = 'least-squares'
             self.mesh = 'user-defined'
             self._set_solver()
-            self._set_points_and_weights()
+            self._quadrature_dirty = True
+            # set_model rebuilds the quadrature on the pruned inputs and solves for the coefficients.
             self.set_model(self.outputs)
+            return
         if self.mesh == 'sparse-grid':
             counter = 0
             multi_index = []
             coefficients = np.empty([1])
             multindices = np.empty([1, self.dimensions])
+            # Row lookup table from each quadrature point to its model evaluation; adding 0.0 maps -0.0 to 0.0.
+            points_lookup = {row.tobytes() : i for i, row in enumerate(self._quadrature_points + 0.0)}
             for tensor in self.quadrature.list:
                 P = self.get_poly(tensor.points, tensor.basis.elements)
-                W = np.diag(np.sqrt(tensor.weights))
-                A = np.dot(W , P.T)
-                _, _ , counts = np.unique( np.vstack( [tensor.points, self._quadrature_points]), axis=0, return_index=True, return_counts=True)
-                indices = [i for i in range(0, len(counts)) if  counts[i] == 2]
-                b = np.dot(W , self._model_evaluations[indices])
-                del counts, indices
+                sqrt_w = np.sqrt(tensor.weights)
+                A = _wscale(P.T, sqrt_w)
+                indices = np.fromiter((points_lookup[row.tobytes()] for row in tensor.points + 0.0), dtype=np.intp, \
+                    count=tensor.points.shape[0])
+                b = _wscale(self._model_evaluations[indices], sqrt_w)
+                del indices
                 coefficients_i = self.solver(A, b)  * self.quadrature.sparse_weights[counter]
                 multindices_i =  tensor.basis.elements
                 coefficients = np.vstack([coefficients_i, coefficients])
@@ -413,28 +506,32 @@ class Poly(object):
                 counter = counter +  1
             multindices = np.delete(multindices, multindices.shape[0]-1, 0)
             coefficients = np.delete(coefficients, coefficients.shape[0]-1)
-            unique_indices, indices , counts = np.unique(multindices, axis=0, return_index=True, return_counts=True)
+            _, indices, inverse_indices = np.unique(_get_multi_index_keys(multindices), return_index=True, \
+                return_inverse=True)
+            unique_indices = multindices[indices, :]
             coefficients_final = np.zeros((unique_indices.shape[0], 1))
-            for i in range(0, unique_indices.shape[0]):
-                for j in range(0, multindices.shape[0]):
-                    if np.array_equiv( unique_indices[i,:] , multindices[j,:]):
-                        coefficients_final[i] = coefficients_final[i] + coefficients[j]
+            np.add.at(coefficients_final[:,0], inverse_indices.ravel(), coefficients.ravel())
             self.coefficients = coefficients_final
             self.basis.elements = unique_indices
         else:
-            P = self.get_poly(self._quadrature_points)
-            W = np.diag(np.sqrt(self._quadrature_weights))
-            A = np.dot(W , P.T)
-            b = np.dot(W , self._model_evaluations)
+            P = self._get_quadrature_poly()
+            sqrt_w = self._sqrt_quadrature_weights
+            A = _wscale(P.T, sqrt_w)
+            b = _wscale(self._model_evaluations, sqrt_w)
             if self.gradient_flag == 1:
                 # Now, we can reduce the number of rows!
                 dP = self.get_poly_grad(self._quadrature_points)
-                C = cell2matrix(dP, W)
-                G = np.vstack([A, C])
-                r =  np.linalg.matrix_rank(G)
-                m, n = A. shape
-                print('Gradient computation: The rank of the stacked matrix is '+str(r)+'.')
-                print('The number of unknown basis terms is '+str(n))
+                C = np.vstack([_wscale(dP_i.T, sqrt_w) for dP_i in dP])
+                m, n = A.shape
+                # The rank diagnostic costs a full SVD of the stacked matrix, so it is only computed when verbose.
+                if self.solver_args is not None and self.solver_args.get('verbose') is True:
+                    G = np.vstack([A, C])
+                    s = np.linalg.svd(G, compute_uv=False)
+                    r = int(np.sum(s > s[0] * max(G.shape) * np.finfo(s.dtype).eps))
+                    print('Gradient computation: The rank of the stacked matrix is '+str(r)+'.')
+                    print('The number of unknown basis terms is '+str(n))
+                else:
+                    r = min(A.shape[0] + C.shape[0], n)
                 if n > r:
                     print('WARNING: Please increase the number of samples; one way to do this would be to increase the sampling-ratio.')
                 self.coefficients = self.solver(A, b, C, self._gradient_evaluations)
@@ -469,6 +566,7 @@ class Poly(object):
         :return:
             **points**: A numpy.ndarray of sampled quadrature points with shape (number_of_samples, dimension).
         """
+        self._ensure_quadrature()
         return self._quadrature_points
     def get_weights(self):
         """
@@ -480,6 +578,7 @@ class Poly(object):
             **weights**: A numpy.ndarray of the corresponding quadrature weights with shape (number_of_samples, 1).
 
         """
+        self._ensure_quadrature()
         return self._quadrature_weights
     def get_points_and_weights(self):
         """
@@ -492,6 +591,7 @@ class Poly(object):
 
             **w**: A numpy.ndarray of the corresponding quadrature weights with shape (number_of_samples, 1).
         """
+        self._ensure_quadrature()
         return self._quadrature_points, self._quadrature_weights
     def get_polyfit(self, stack_of_points):
         """
@@ -505,7 +605,45 @@ class Poly(object):
             **p**: A numpy.ndarray of shape (1, number_of_observations) corresponding to the polynomial approximation of the model.
         """
         N = len(self.coefficients)
-        return np.dot(self.get_poly(stack_of_points).T , self.coefficients.reshape(N, 1))
+        if self.dimensions > 1 and getattr(self, 'mesh', None) == 'tensor-grid' and self.basis.basis_type == 'tensor-grid':
+            return self._get_polyfit_tensor(stack_of_points)
+        if stack_of_points.ndim == 1 or stack_of_points.shape[0] <= POLYFIT_BLOCK_SIZE:
+            return np.dot(self.get_poly(stack_of_points).T , self.coefficients.reshape(N, 1))
+        # Stream through the points in blocks, so only a (cardinality, POLYFIT_BLOCK_SIZE) slab is held in memory.
+        no_of_points = stack_of_points.shape[0]
+        p = np.empty((no_of_points, 1))
+        for start in range(0, no_of_points, POLYFIT_BLOCK_SIZE):
+            end = min(start + POLYFIT_BLOCK_SIZE, no_of_points)
+            p[start:end] = np.dot(self.get_poly(stack_of_points[start:end]).T , self.coefficients.reshape(N, 1))
+        return p
+    def _get_polyfit_tensor(self, stack_of_points):
+        """
+        Private function that evaluates the polynomial approximation on a tensor-grid basis by sum factorization. The
+        coefficients are arranged into a d-dimensional array and contracted one dimension at a time against the univariate
+        polynomials, so the full (cardinality, number_of_observations) matrix from get_poly is never formed.
+
+        :param Poly self:
+            An instance of the Poly class.
+        :param numpy.ndarray stack_of_points:
+            An ndarray with shape (number_of_observations, dimensions) at which the polynomial fit must be evaluated at.
+        :return:
+            **p**: A numpy.ndarray of shape (number_of_observations, 1) corresponding to the polynomial approximation of the model.
+        """
+        if stack_of_points.ndim == 1:
+            stack_of_points = np.reshape(stack_of_points, (1, self.dimensions))
+        no_of_points = stack_of_points.shape[0]
+        elements, orders = self._get_basis_int()
+        coefficients_tensor = np.zeros(tuple(orders + 1))
+        coefficients_tensor[tuple(elements.T)] = np.ravel(self.coefficients)
+        P, _, _ = Parameter.batch_get_orthogonal_polynomial(self.parameters, stack_of_points, orders)
+        result = coefficients_tensor
+        for k in range(self.dimensions - 1, -1, -1):
+            p = P[k, 0:orders[k] + 1, :]
+            if k == self.dimensions - 1:
+                result = np.dot(result, p)
+            else:
+                result = np.einsum('...kt,kt->...t', result, p)
+        return np.reshape(result, (no_of_points, 1))
     def get_polyfit_grad(self, stack_of_points, dim_index = None):
         """
         Evaluates the gradient of the polynomial approximation of a function (or model data) at prescribed points.
@@ -524,11 +662,9 @@ class Poly(object):
         else:
             no_of_points, _ = stack_of_points.shape
         H = self.get_poly_grad(stack_of_points, dim_index=dim_index)
-        grads = np.zeros((self.dimensions, no_of_points ) )
         if self.dimensions == 1:
             return np.dot(self.coefficients.reshape(N,),  H)
-        for i in range(0, self.dimensions):
-            grads[i,:] = np.dot(self.coefficients.reshape(N,) , H[i] )
+        grads = np.einsum('n,kni->ki', self.coefficients.reshape(N,), H).reshape(self.dimensions, no_of_points)
         return grads
     def get_polyfit_hess(self, stack_of_points):
         """
@@ -542,17 +678,17 @@ class Poly(object):
         :return:
             **h**: A numpy.ndarray of shape (dimensions, dimensions, number_of_observations) corresponding to the polynomial Hessian approximation of the model.
         """
-        if stack_of_points.ndim == 1:
-            no_of_points = 1
-        else:
-            no_of_points, _ = stack_of_points.shape
-        H = self.get_poly_hess(stack_of_points)
         if self.dimensions == 1:
+            H = self.get_poly_hess(stack_of_points)
             return np.dot(self.coefficients.T , H)
-        hess = np.zeros((self.dimensions, self.dimensions, no_of_points))
-        for i in range(0, self.dimensions):
-            for j in range(0, self.dimensions):
-                hess[i, j, :] = np.dot(self.coefficients.T , H[i * self.dimensions + j])
+        N = len(self.coefficients)
+        coefficients = self.coefficients.reshape(N,)
+        # Contract the upper triangle of the basis Hessians with the coefficients and mirror it into the lower triangle.
+        H = self._get_poly_hess_upper(stack_of_points)
+        hess = np.empty((self.dimensions, self.dimensions, H.shape[3]))
+        for w in range(0, self.dimensions):
+            hess[w, w:] = np.einsum('n,vni->vi', coefficients, H[w, w:])
+            hess[w+1:, w] = hess[w, w+1:]
         return hess
     def get_polyfit_function(self):
         """
@@ -563,8 +699,45 @@ class Poly(object):
         :return:
             A callable function.
         """
-        N = len(self.coefficients)
-        return lambda x: np.dot( self.get_poly(x).T ,  self.coefficients.reshape(N, 1) )
+        return lambda x: self.get_polyfit(x)
+    def compile_polyfit(self):
+        """
+        Returns a compiled callable polynomial approximation of a function (or model data). The recurrence coefficients,
+        multi-indices and coefficients are frozen at the time of the call, and evaluation is carried out by a single
+        kernel that is compiled with numba. Useful when the polynomial is used as a surrogate that is evaluated
+        repeatedly, e.g., within an optimiser or a Monte Carlo loop. If numba is not installed, or the kernel could not
+        be compiled, this falls back to the callable returned by get_polyfit_function.
+
+        :param Poly self:
+            An instance of the Poly class.
+        :return:
+            A callable function.
+        """
+        kernel = _get_compiled_kernel(_get_polyfit_kernel, POLYFIT_KERNEL_SIGNATURE)
+        if kernel is None:
+            return self.get_polyfit_function()
+        multi_indices = np.ascontiguousarray(self.basis.elements, dtype=np.int64)
+        coefficients = np.ascontiguousarray(self.coefficients, dtype=np.float64).ravel()
+        orders = np.max(multi_indices, axis=0)
+        highest_order = int(np.max(orders))
+        ab = np.zeros((self.dimensions, highest_order + 1, 2))
+        ab[:, :, 1] = 1.0
+        for i in range(0, self.dimensions):
+            ab[i, 0:orders[i] + 1, :] = self.parameters[i].get_recurrence_coefficients(int(orders[i]) + 1)[0:orders[i] + 1, :]
+        parameters = self.parameters
+        dimensions = self.dimensions
+        def polyfit(stack_of_points):
+            stack_of_points = np.asarray(stack_of_points, dtype=np.float64)
+            if stack_of_points.ndim == 1:
+                if dimensions == 1:
+                    stack_of_points = stack_of_points.reshape(len(stack_of_points), 1)
+                else:
+                    stack_of_points = stack_of_points.reshape(1, dimensions)
+            X = np.empty(stack_of_points.shape)
+            for i in range(0, dimensions):
+                X[:, i] = parameters[i]._get_scaled_points(stack_of_points[:, i])
+            return kernel(X, ab, multi_indices, coefficients).reshape(X.shape[0], 1)
+        return polyfit
     def get_polyfit_grad_function(self):
         """
         Returns a callable for the gradients of the polynomial approximation of a function (or model data).
@@ -598,34 +771,69 @@ class Poly(object):
             **polynomial**: A numpy.ndarray of shape (cardinality, number_of_observations) corresponding to the polynomial basis function evaluations
             at the stack_of_points.
         """
-        if custom_multi_index is None:
-            basis = self.basis.elements
-        else:
-            basis = custom_multi_index
+        basis, basis_max = self._get_basis_int(custom_multi_index)
         basis_entries, dimensions = basis.shape
 
         if stack_of_points.ndim == 1:
-            no_of_points = 1
-        else:
-            no_of_points, _ = stack_of_points.shape
-        p = {}
+            if dimensions == 1:
+                # a 1d array of inputs, and each input is 1d
+                stack_of_points = stack_of_points[:, np.newaxis]
+            else:
+                # a 1d array representing 1 point, in multiple dimensions!
+                stack_of_points = stack_of_points[np.newaxis, :]
+        no_of_points = stack_of_points.shape[0]
 
         # Save time by returning if univariate!
         if dimensions == 1:
-            poly , _ , _ =  self.parameters[0]._get_orthogonal_polynomial(stack_of_points, int(np.max(basis)))
+            poly , _ , _ =  self.parameters[0]._get_orthogonal_polynomial(stack_of_points, int(basis_max[0]))
             return poly
-        else:
-            for i in range(0, dimensions):
-                if len(stack_of_points.shape) == 1:
-                    stack_of_points = np.array([stack_of_points])
-                p[i] , _ , _ = self.parameters[i]._get_orthogonal_polynomial(stack_of_points[:,i], int(np.max(basis[:,i])) )
 
-        # One loop for polynomials
-        polynomial = np.ones((basis_entries, no_of_points))
-        for k in range(dimensions):
-            basis_entries_this_dim = basis[:, k].astype(int)
-            polynomial *= p[k][basis_entries_this_dim]
+        # Evaluate every dimension's univariate polynomials into one array and reduce the product in a single pass
+        P, _, _ = Parameter.batch_get_orthogonal_polynomial(self.parameters, stack_of_points, basis_max)
+        # Multiply the gathered rows over blocks of points small enough for a (cardinality, block) slab to stay in cache. Large
+        # bases would shrink the block to a few points, where the per-block Python overhead dominates, so the block has a floor.
+        polynomial = np.empty((basis_entries, no_of_points))
+        block = max(CACHE_BLOCK_MIN_POINTS, CACHE_BLOCK_FLOATS // basis_entries)
+        for start in range(0, no_of_points, block):
+            end = min(start + block, no_of_points)
+            polynomial_block = polynomial[:, start:end]
+            polynomial_block[...] = P[0, :, start:end][basis[:,0]]
+            for k in range(1, dimensions):
+                polynomial_block *= P[k, :, start:end][basis[:,k]]
         return polynomial
+    def get_poly_batched(self, stack_of_points, n_workers=None):
+        """
+        Evaluates the value of each polynomial basis function at a large set of points, splitting the points into chunks
+        that are evaluated concurrently with a pool of threads. The NumPy operations in get_poly release the GIL,
+        so chunks run in parallel. If concurrent.futures is not avaliable (Python 2.7 without the futures backport), this
+        falls back to get_poly.
+
+        :param Poly self:
+            An instance of the Poly class.
+        :param numpy.ndarray stack_of_points:
+            An ndarray with shape (number of observations, dimensions) at which the polynomial must be evaluated.
+        :param int n_workers:
+            The number of threads; defaults to the number of CPUs.
+
+        :return:
+            **polynomial**: A numpy.ndarray of shape (cardinality, number_of_observations), identical to the output of get_poly.
+        """
+        try:
+            from concurrent.futures import ThreadPoolExecutor
+        except ImportError:
+            return self.get_poly(stack_of_points)
+        if n_workers is None:
+            from multiprocessing import cpu_count
+            n_workers = cpu_count()
+        if stack_of_points.ndim == 1 or n_workers <= 1 or stack_of_points.shape[0] <= POLYFIT_BLOCK_SIZE:
+            return self.get_poly(stack_of_points)
+        self._get_basis_int()
+        no_of_points = stack_of_points.shape[0]
+        chunk = max(POLYFIT_BLOCK_SIZE, -(-no_of_points // n_workers))
+        chunks = [stack_of_points[start:start + chunk] for start in range(0, no_of_points, chunk)]
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            polynomials = list(executor.map(self.get_poly, chunks))
+        return np.concatenate(polynomials, axis=1)
     def get_poly_grad(self, stack_of_points, dim_index = None):
         """
         Evaluates the gradient for each of the polynomial basis functions at a set of points,
@@ -637,49 +845,43 @@ class Poly(object):
             An ndarray with shape (number_of_observations, dimensions) at which the gradient must be evaluated.
 
         :return:
-            **Gradients**: A list with d elements, where d corresponds to the dimension of the problem. Each element is a numpy.ndarray of shape
-            (cardinality, number_of_observations) corresponding to the gradient polynomial evaluations at the stack_of_points.
+            **Gradients**: A numpy.ndarray of shape (d, cardinality, number_of_observations), where d corresponds to the dimension of the problem.
+            Element [i] holds the derivative of the polynomial basis functions with respect to the i-th input at the stack_of_points.
         """
         # "Unpack" parameters from "self"
-        basis = self.basis.elements
+        basis, basis_max = self._get_basis_int()
         basis_entries, dimensions = basis.shape
-        if len(stack_of_points.shape) == 1:
+        if stack_of_points.ndim == 1:
             if dimensions == 1:
                 # a 1d array of inputs, and each input is 1d
-                stack_of_points = np.reshape(stack_of_points, (len(stack_of_points),1))
+                stack_of_points = stack_of_points[:, np.newaxis]
             else:
                 # a 1d array representing 1 point, in multiple dimensions!
-                stack_of_points = np.array([stack_of_points])
-        no_of_points, _ = stack_of_points.shape
-        p = {}
-        dp = {}
+                stack_of_points = stack_of_points[np.newaxis, :]
+        no_of_points = stack_of_points.shape[0]
 
         # Save time by returning if univariate!
         if dimensions == 1:
-            _ , dpoly, _ =  self.parameters[0]._get_orthogonal_polynomial(stack_of_points, int(np.max(basis) ) )
+            _ , dpoly, _ =  self.parameters[0]._get_orthogonal_polynomial(stack_of_points, int(basis_max[0]) )
             return dpoly
-        else:
-            for i in range(0, dimensions):
-                if len(stack_of_points.shape) == 1:
-                    stack_of_points = np.array([stack_of_points])
-                p[i] , dp[i], _ = self.parameters[i]._get_orthogonal_polynomial(stack_of_points[:,i], int(np.max(basis[:,i])) )
-
-        # One loop for polynomials
-        R = []
-        if dim_index is None:
-            dim_index = range(dimensions)
+        P, DP, _ = Parameter.batch_get_orthogonal_polynomial(self.parameters, stack_of_points, basis_max, derivative_order=1)
+
+        # Gradient v is prefix[v] * DP[v] * suffix[v + 1], where prefix and suffix are running products of the gathered
+        # univariate polynomials over dimensions below and above v. The suffix products are built in R itself.
+        R = np.empty((dimensions, basis_entries, no_of_points))
+        R[dimensions - 1] = 1.0
+        for v in range(dimensions - 2, -1, -1):
+            np.multiply(R[v + 1], P[v + 1][basis[:,v + 1]], out=R[v])
+        prefix = np.ones((basis_entries, no_of_points))
         for v in range(dimensions):
-            if not(v in dim_index):
-                R.append(np.zeros((basis_entries, no_of_points)))
-            else:
-                polynomialgradient = np.ones((basis_entries, no_of_points))
-                for k in range(dimensions):
-                    basis_entries_this_dim = basis[:,k].astype(int)
-                    if k==v:
-                        polynomialgradient *= dp[k][basis_entries_this_dim]
-                    else:
-                        polynomialgradient *= p[k][basis_entries_this_dim]
-                R.append(polynomialgradient)
+            R[v] *= prefix
+            R[v] *= DP[v][basis[:,v]]
+            if v < dimensions - 1:
+                prefix *= P[v][basis[:,v]]
+        if dim_index is not None:
+            for v in range(dimensions):
+                if not(v in dim_index):
+                    R[v] = 0.0
         return R
     def get_poly_hess(self, stack_of_points):
         """
@@ -693,52 +895,204 @@ class Poly(object):
 
         :return:
             **Hessian**: A list with d^2 elements, where d corresponds to the dimension of the model. Each element is a numpy.ndarray of shape
-            (cardinality, number_of_observations) corresponding to the hessian polynomial evaluations at the stack_of_points.
+            (cardinality, number_of_observations) corresponding to the hessian polynomial evaluations at the stack_of_points. As the Hessian is
+            symmetric, elements (i, j) and (j, i) are the same array; copy an element before modifying it in place.
 
         """
-        # "Unpack" parameters from "self"
-        basis = self.basis.elements
+        # Save time by returning if univariate!
+        if self.basis.elements.shape[1] == 1:
+            _, basis_max = self._get_basis_int()
+            if stack_of_points.ndim == 1:
+                # a 1d array of inputs, and each input is 1d
+                stack_of_points = stack_of_points[:, np.newaxis]
+            _, _, d2poly = self.parameters[0]._get_orthogonal_polynomial(stack_of_points, int(basis_max[0]))
+            return d2poly
+        polynomialhessian = self._get_poly_hess_upper(stack_of_points)
+        dimensions = polynomialhessian.shape[0]
+        # Only the upper triangle (w <= v) is computed; the Hessian is symmetric, so entry (v, w) aliases entry (w, v).
+        H = [polynomialhessian[min(w, v), max(w, v)] for w in range(0, dimensions) for v in range(0, dimensions)]
+        return H
+    def _get_poly_hess_upper(self, stack_of_points):
+        """
+        Private function that evaluates the Hessian of each multivariate polynomial basis function at a set of points. Only the
+        upper triangle (w <= v) is computed; entries below the diagonal are left uninitialised.
+
+        :param Poly self:
+            An instance of the Poly class.
+        :param numpy.ndarray stack_of_points:
+            An ndarray with shape (number_of_observations, dimensions) at which the Hessian must be evaluated.
+
+        :return:
+            **polynomialhessian**: A numpy.ndarray of shape (dimensions, dimensions, cardinality, number_of_observations).
+        """
+        basis, basis_max = self._get_basis_int()
         basis_entries, dimensions = basis.shape
         if stack_of_points.ndim == 1:
-            no_of_points = 1
+            # a 1d array representing 1 point, in multiple dimensions!
+            stack_of_points = stack_of_points[np.newaxis, :]
+        no_of_points = stack_of_points.shape[0]
+        P, DP, D2P = Parameter.batch_get_orthogonal_polynomial(self.parameters, stack_of_points, basis_max + 1, derivative_order=2)
+        polynomialhessian = np.empty((dimensions, dimensions, basis_entries, no_of_points))
+        kernel = _get_compiled_kernel(_get_poly_hess_kernel, POLY_HESS_KERNEL_SIGNATURE)
+        if kernel is not None:
+            kernel(P, DP, D2P, basis.astype(np.int64, copy=False), polynomialhessian)
         else:
-            no_of_points, _ = stack_of_points.shape
-        p = {}
-        dp = {}
-        d2p = {}
+            _get_poly_hess_vectorised(P, DP, D2P, basis, polynomialhessian)
+        return polynomialhessian
+_COMPILED_KERNELS = {}
+def _get_compiled_kernel(function, signature):
+    """
+    Private function that returns a kernel compiled with numba for an explicit signature. The kernel is compiled on first use
+    only and memoised; numba's on-disk cache then means later sessions load it rather than compile it again.
 
-        # Save time by returning if univariate!
-        if dimensions == 1:
-            _, _, d2poly = self.parameters[0]._get_orthogonal_polynomial(stack_of_points, int(np.max(basis)))
-            return d2poly
-        else:
-            for i in range(0, dimensions):
-                if len(stack_of_points.shape) == 1:
-                    stack_of_points = np.array([stack_of_points])
-                p[i], dp[i], d2p[i] = self.parameters[i]._get_orthogonal_polynomial(stack_of_points[:, i],
-                                                                       int(np.max(basis[:, i]) + 1))
-        H = []
-        for w in range(0, dimensions):
-            gradDirection1 = w
-            for v in range(0, dimensions):
-                gradDirection2 = v
-                polynomialhessian = np.zeros((basis_entries, no_of_points))
-                for i in range(0, basis_entries):
-                    temp = np.ones((1, no_of_points))
-                    for k in range(0, dimensions):
-                        if k == gradDirection1 == gradDirection2:
-                            polynomialhessian[i, :] = d2p[k][int(basis[i, k])] * temp
-                        elif k == gradDirection1:
-                            polynomialhessian[i, :] = dp[k][int(basis[i, k])] * temp
-                        elif k == gradDirection2:
-                            polynomialhessian[i, :] = dp[k][int(basis[i, k])] * temp
-                        else:
-                            polynomialhessian[i, :] = p[k][int(basis[i, k])] * temp
-                        temp = polynomialhessian[i, :]
-                H.append(polynomialhessian)
+    :param callable function:
+        The Python implementation of the kernel.
+    :param string signature:
+        The numba signature of the kernel.
+    :return:
+        The compiled kernel, or None if numba is not avaliable or the kernel could not be compiled; callers then use their NumPy path.
+    """
+    if not numba_imported:
+        return None
+    if function not in _COMPILED_KERNELS:
+        try:
+            _COMPILED_KERNELS[function] = njit(signature, parallel=True, fastmath=True, cache=True)(function)
+        except NumbaError as error:
+            print('WARNING: numba could not compile '+function.__name__+'; falling back to NumPy. '+str(error))
+            _COMPILED_KERNELS[function] = None
+    return _COMPILED_KERNELS[function]
+def _get_poly_hess_kernel(P, DP, D2P, basis, polynomialhessian):
+    """
+    Private kernel that fills the upper triangle (w <= v) of the Hessian of every basis function; compiled with numba when avaliable, with a parallel
+    loop over the basis functions and a contiguous inner loop over the points. Products of the univariate polynomials over the dimensions above
+    each index (suffix) and below it (prefix) are shared across all entries, so each entry costs a few multiplications rather than a full
+    product over the dimensions.
+
+    :param numpy.ndarray P:
+        Univariate polynomials of shape (dimensions, highest_order + 1, number_of_observations); DP and D2P hold their
+        first and second derivatives.
+    :param numpy.ndarray basis:
+        An integer ndarray with shape (cardinality, dimensions).
+    :param numpy.ndarray polynomialhessian:
+        Output array of shape (dimensions, dimensions, cardinality, number_of_observations).
+    """
+    basis_entries, dimensions = basis.shape
+    no_of_points = P.shape[2]
+    for i in prange(basis_entries):
+        suffix = np.ones((dimensions + 1, no_of_points))
+        for k in range(dimensions - 1, -1, -1):
+            order = basis[i, k]
+            for t in range(no_of_points):
+                suffix[k, t] = suffix[k + 1, t] * P[k, order, t]
+        prefix = np.ones(no_of_points)
+        running = np.empty(no_of_points)
+        for w in range(dimensions):
+            order_w = basis[i, w]
+            for t in range(no_of_points):
+                polynomialhessian[w, w, i, t] = prefix[t] * D2P[w, order_w, t] * suffix[w + 1, t]
+                running[t] = prefix[t] * DP[w, order_w, t]
+            for v in range(w + 1, dimensions):
+                order_v = basis[i, v]
+                for t in range(no_of_points):
+                    polynomialhessian[w, v, i, t] = running[t] * DP[v, order_v, t] * suffix[v + 1, t]
+                    running[t] *= P[v, order_v, t]
+            for t in range(no_of_points):
+                prefix[t] *= P[w, order_w, t]
+    return polynomialhessian
+POLY_HESS_KERNEL_SIGNATURE = 'float64[:,:,:,::1](float64[:,:,::1], float64[:,:,::1], float64[:,:,::1], int64[:,::1], float64[:,:,:,::1])'
+def _get_poly_hess_vectorised(P, DP, D2P, basis, polynomialhessian):
+    """
+    Private function with the same contract as _get_poly_hess_kernel, vectorised over the basis functions and points
+    with NumPy; used when numba is not avaliable.
+    """
+    basis_entries, dimensions = basis.shape
+    suffix = np.ones((dimensions + 1, basis_entries, P.shape[2]))
+    for k in range(dimensions - 1, -1, -1):
+        np.multiply(suffix[k + 1], P[k, basis[:,k]], out=suffix[k])
+    prefix = np.ones((basis_entries, P.shape[2]))
+    for w in range(dimensions):
+        polynomialhessian[w, w] = prefix * D2P[w, basis[:,w]] * suffix[w + 1]
+        running = prefix * DP[w, basis[:,w]]
+        for v in range(w + 1, dimensions):
+            np.multiply(running * DP[v, basis[:,v]], suffix[v + 1], out=polynomialhessian[w, v])
+            running *= P[v, basis[:,v]]
+        prefix *= P[w, basis[:,w]]
+    return polynomialhessian
+def _get_multi_index_keys(multi_indices):
+    """
+    Private function that encodes each row of a multi-index set as a single integer, by treating the row as the digits
+    of a number in base (highest order + 1). Sorting the keys orders the rows lexicographically, as np.unique with
+    axis=0 would, but compares one integer per row rather than byte views of whole rows.
 
-        return H
-def evaluate_model_gradients(points, fungrad, format):
+    :param numpy.ndarray multi_indices:
+        An ndarray with shape (number_of_indices, dimensions) of non-negative orders.
+    :return:
+        **keys**: A numpy.ndarray of shape (number_of_indices, ) of integer keys.
+    """
+    multi_indices = multi_indices.astype(np.int64)
+    number_of_indices, dimensions = multi_indices.shape
+    base = int(np.max(multi_indices)) + 1 if number_of_indices > 0 else 1
+    if dimensions * np.log2(max(base, 2)) >= 63:
+        # Keys would overflow; fall back to ranking the rows directly.
+        _, keys = np.unique(multi_indices, axis=0, return_inverse=True)
+        return keys.ravel()
+    keys = multi_indices[:,0].copy()
+    for k in range(1, dimensions):
+        keys = keys * base + multi_indices[:,k]
+    return keys
+def _wscale(M, sqrt_w):
+    """
+    Private function that scales the rows of M by sqrt_w; equivalent to np.dot(np.diag(sqrt_w), M) without forming
+    the dense diagonal matrix.
+
+    :param numpy.ndarray M:
+        An ndarray with shape (number_of_observations, ) or (number_of_observations, n).
+    :param numpy.ndarray sqrt_w:
+        An ndarray with number_of_observations entries; either of shape (number_of_observations, ) or (number_of_observations, 1).
+    """
+    sqrt_w = np.ravel(sqrt_w)
+    if M.ndim == 1:
+        return np.multiply(M, sqrt_w)
+    return np.multiply(M, sqrt_w[:, None])
+def _get_polyfit_kernel(X, ab, multi_indices, coefficients):
+    """
+    Private kernel that evaluates a polynomial expansion at X via the three-term recurrence. When numba is
+    avaliable this is compiled with a parallel loop over the points.
+
+    :param numpy.ndarray X:
+        An ndarray with shape (number_of_observations, dimensions) of (scaled) points.
+    :param numpy.ndarray ab:
+        An ndarray with shape (dimensions, highest_order + 1, 2) of recurrence coefficients.
+    :param numpy.ndarray multi_indices:
+        An integer ndarray with shape (cardinality, dimensions).
+    :param numpy.ndarray coefficients:
+        An ndarray with shape (cardinality, ) of coefficients.
+    :return:
+        **y**: A numpy.ndarray of shape (number_of_observations, ) with the polynomial evaluations.
+    """
+    no_of_points, dimensions = X.shape
+    basis_entries = multi_indices.shape[0]
+    highest_order = ab.shape[1] - 1
+    y = np.zeros(no_of_points)
+    for t in prange(no_of_points):
+        p = np.zeros((dimensions, highest_order + 1))
+        for k in range(dimensions):
+            p[k, 0] = 1.0
+            if highest_order >= 1:
+                p[k, 1] = (X[t, k] - ab[k, 0, 0]) / np.sqrt(ab[k, 1, 1])
+            for u in range(2, highest_order + 1):
+                p[k, u] = ((X[t, k] - ab[k, u - 1, 0]) * p[k, u - 1] - np.sqrt(ab[k, u - 1, 1]) * p[k, u - 2]) \
+                    / np.sqrt(ab[k, u, 1])
+        total = 0.0
+        for i in range(basis_entries):
+            term = coefficients[i]
+            for k in range(dimensions):
+                term *= p[k, multi_indices[i, k]]
+            total += term
+        y[t] = total
+    return y
+POLYFIT_KERNEL_SIGNATURE = 'float64[::1](float64[:,::1], float64[:,:,::1], int64[:,::1], float64[::1])'
+def evaluate_model_gradients(points, fungrad, format, vectorised=False):
     """
     Evaluates the model gradient at given values.
 
@@ -750,34 +1104,40 @@ def evaluate_model_gradients(points, fungrad, format):
         The format in which the output is to be provided: ``matrix`` will output a numpy.ndarray of shape
         (number_of_observations, dimensions) with gradient values, while ``vector`` will stack all the
         vectors in this matrix to yield a numpy.ndarray with shape (number_of_observations x dimensions, 1).
+    :param bool vectorised:
+        Set to True if ``fungrad`` accepts the full (number_of_observations, dimensions) array of points and returns
+        all the gradients at once; it is then called a single time instead of once per point.
 
     :return:
         **grad_values**: A numpy.ndarray of gradient evaluations.
 
+    """
+    if format not in _GRADIENT_FORMATS:
+        raise ValueError('evalgradients(): Format must be either matrix or vector!')
+    return _GRADIENT_FORMATS[format](points, fungrad, vectorised)
+def _get_model_gradients_matrix(points, fungrad, vectorised):
+    """
+    Private function that evaluates the model gradient as a numpy.ndarray of shape (number_of_observations, dimensions).
     """
     dimensions = len(points[0,:])
-    if format is 'matrix':
-        grad_values = np.zeros((len(points), dimensions))
-        # For loop through all the points
-        for i in range(0, len(points)):
-            output_from_gradient_call = fungrad(points[i,:])
-            for j in range(0, dimensions):
-                grad_values[i,j] = output_from_gradient_call[j]
+    if vectorised:
+        grad_values = np.asarray(fungrad(points), dtype=np.float64)
+        if grad_values.shape != (len(points), dimensions):
+            raise ValueError('evaluate_model_gradients(): a vectorised gradient must return an array of shape (number_of_observations, dimensions)!')
         return grad_values
-    elif format is 'vector':
-        grad_values = np.zeros((len(points) * dimensions, 1))
-        # For loop through all the points
-        counter = 0
-        for i in range(0, len(points)):
-            output_from_gradient_call = fungrad(points[i,:])
-            for j in range(0, dimensions):
-                grad_values[counter, 0] = output_from_gradient_call[j]
-                counter = counter + 1
-        return np.mat(grad_values)
-    else:
-        error_function('evalgradients(): Format must be either matrix or vector!')
-        return 0
-def evaluate_model(points, function):
+    grad_values = np.zeros((len(points), dimensions))
+    # For loop through all the points
+    for i in range(0, len(points)):
+        grad_values[i,:] = np.ravel(fungrad(points[i,:]))[0:dimensions]
+    return grad_values
+def _get_model_gradients_vector(points, fungrad, vectorised):
+    """
+    Private function that evaluates the model gradient as a numpy.ndarray of shape (number_of_observations x dimensions, 1).
+    """
+    grad_values = _get_model_gradients_matrix(points, fungrad, vectorised)
+    return grad_values.reshape(grad_values.size, 1)
+_GRADIENT_FORMATS = {'matrix': _get_model_gradients_matrix, 'vector': _get_model_gradients_vector}
+def evaluate_model(points, function, vectorised=False):
     """
     Evaluates the model function at given values.
 
@@ -785,10 +1145,18 @@ def evaluate_model(points, function):
         An ndarray with shape (number_of_observations, dimensions) at which the gradient must be evaluated.
     :param callable function:
         A callable argument for the function.
+    :param bool vectorised:
+        Set to True if ``function`` accepts the full (number_of_observations, dimensions) array of points and returns
+        all the function values at once; it is then called a single time instead of once per point.
 
     :return:
         **function_values**: A numpy.ndarray of function evaluations.
     """
+    if vectorised:
+        function_values = np.asarray(function(points), dtype=np.float64)
+        if function_values.size != len(points):
+            raise ValueError('evaluate_model(): a vectorised function must return one value per observation!')
+        return function_values.reshape(len(points), 1)
     function_values = np.zeros((len(points), 1))
     for i in range(0, len(points)):
         function_values[i,0] = function(points[i,:])
@@ -814,23 +1182,25 @@ def vector_to_2D_grid(coefficients, index_set):
     max_order = int(np.max(index_set)) + 1
     x, y = np.mgrid[0:max_order, 0:max_order]
     z = np.full(x.shape, float('NaN'))
-    indices = index_set.astype(int)
-    l = len(coefficients)
-    coefficients = np.reshape(coefficients, (1, l))
-    z[indices[:,0], indices[:,1]] = coefficients
+    if np.issubdtype(index_set.dtype, np.integer):
+        indices = index_set
+    else:
+        indices = index_set.astype(np.intp)
+    z[indices[:,0], indices[:,1]] = np.ravel(coefficients)
     return x, y, z, max_order
 def cell2matrix(G, W):
-    dimensions = len(G)
-    G0 = G[0] # Which by default has to exist!
-    C0 = G0.T
-    rows, cols = C0.shape
-    BigC = np.zeros((dimensions*rows, cols))
-    counter = 0
-    for i in range(0, dimensions):
-        K = np.dot(W, G[i].T)
-        for j in range(0, rows):
-            for k in range(0,cols):
-                BigC[counter,k] = K[j,k]
-            counter = counter + 1
-    BigC = np.mat(BigC)
+    """
+    Stacks the products W G[i].T for every element of G into a single matrix.
+
+    :param G:
+        A list of d numpy.ndarrays of the same shape (cols, rows), or a numpy.ndarray of shape (d, cols, rows).
+    :param numpy.ndarray W:
+        A numpy.ndarray of shape (rows, rows).
+
+    :return:
+        **BigC**: A numpy.ndarray of shape (d x rows, cols).
+    """
+    G = np.asarray(G)
+    K = np.matmul(W, np.swapaxes(G, 1, 2))
+    BigC = K.reshape(K.shape[0] * K.shape[1], K.shape[2])
     return BigC
@@ -1,6 +1,6 @@
 """Solvers for computing of a linear system."""
 import numpy as np
-from scipy.linalg import qr
+from scipy.linalg import qr, lstsq
 from copy import deepcopy
 class Solver(object):
     """
@@ -31,7 +31,9 @@ class Solver(object):
     def get_solver(self):
         return self.solver
 def least_squares(A, b, verbose):
-    alpha = np.linalg.lstsq(A, b, rcond=None)
+    # QR with column pivoting (gelsy) is cheaper than the SVD-based default driver. Its default rank cutoff is machine
+    # epsilon, so pass the same cutoff as numpy.linalg.lstsq to truncate rank-deficient systems.
+    alpha = lstsq(A, b, cond=np.finfo(np.float64).eps * max(A.shape), lapack_driver='gelsy')
     if verbose is True:
         print('The condition number of the matrix is '+str(np.linalg.cond(A))+'.')
     return alpha[0]
@@ -12,6 +12,8 @@ class Subsampling(object):
         self.subsampling_algorithm = subsampling_algorithm
         if self.subsampling_algorithm == 'qr':
             self.algorithm = lambda A, k : get_qr_column_pivoting(A, k)
+        elif self.subsampling_algorithm == 'randomized-qr':
+            self.algorithm = lambda A, k : get_randomized_qr_column_pivoting(A, k)
         elif self.subsampling_algorithm == 'svd':
             self.algorithm = lambda A, k : get_svd_subset_selection(A, k)
         elif self.subsampling_algorithm == 'newton':
@@ -35,6 +37,40 @@ def get_qr_column_pivoting(Ao, number_of_subsamples):
     _, _, pvec = qr(A.T, pivoting=True)
     z = pvec[0:number_of_subsamples]
     return z
+def get_randomized_qr_column_pivoting(Ao, number_of_subsamples, block_size=32, oversampling=8):
+    """
+    Randomized blocked QR factorization with column pivoting [1], where the pivots are used as a heuristic for subsampling.
+    Instead of choosing one pivot at a time, a block of pivots is chosen from a pivoted QR of a small Gaussian sketch
+    of the (deflated) matrix, after which the selected columns are projected out. Both steps are matrix-matrix products.
+    Once the rank of the matrix is exhausted, selection restarts on the remaining columns.
+
+    **References**
+        1. Duersch, J. A., Gu, M., (2017) Randomized QR with Column Pivoting. SIAM Journal on Scientific Computing, 39(4). `Paper <https://epubs.siam.org/doi/10.1137/15M1044680>`__
+
+    """
+    B = np.array(Ao, dtype=np.float64).T
+    n, m = B.shape
+    number_of_subsamples = min(int(number_of_subsamples), m)
+    remaining = np.arange(m)
+    R = B.copy()
+    rank_used = 0
+    pvec = []
+    while len(pvec) < number_of_subsamples:
+        if rank_used >= n:
+            R = B[:, remaining]
+            rank_used = 0
+        block = min(block_size, number_of_subsamples - len(pvec), n - rank_used)
+        Omega = np.random.randn(block + oversampling, n)
+        _, piv = qr(np.dot(Omega, R), pivoting=True, mode='r')
+        selected = piv[0:block]
+        Q, _ = np.linalg.qr(R[:, selected])
+        R = R - np.dot(Q, np.dot(Q.T, R))
+        pvec.extend(remaining[selected])
+        remaining = np.delete(remaining, selected)
+        R = np.delete(R, selected, axis=1)
+        rank_used = rank_used + block
+    z = np.asarray(pvec)
+    return z
 def get_svd_subset_selection(Ao, number_of_subsamples):
     """
     Singular value decomposition and pivoted QR factorization, where the pivots
@@ -54,7 +90,7 @@ def get_newton_determinant_maximization(Ao, number_of_subsamples):
         1. Joshi, S., Boyd, S., (2009) Sensor Selection via Convex Optimization. IEEE Transactions on Signal Processing, 57(2). `Paper <https://ieeexplore.ieee.org/document/4663892>`__
 
     """
-    A = deepcopy(Ao)
+    A = np.array(Ao, dtype=np.float64)
     maxiter = 50
     n_tol = 1e-12
     gap = 1.005
@@ -63,7 +99,7 @@ def get_newton_determinant_maximization(Ao, number_of_subsamples):
     alpha = 0.01
     beta = 0.5
 
-    # Assuming the input matrix is an np.matrix()
+    # Products of the form A.T diag(z) A are computed by scaling the rows of A by z.
     m, n = A.shape
     if m < n:
         raise(ValueError, 'maxdet(): requires the number of columns to be greater than the number of rows!')
@@ -74,16 +110,13 @@ def get_newton_determinant_maximization(Ao, number_of_subsamples):
     kappa = np.log(gap) * n/m
 
     # Objective function
-    Z = _diag(z)
-    fz = -np.log(np.linalg.det(A.T * Z * A)) - kappa * np.sum(np.log(z) + np.log(1.0 - z))
+    fz = -np.log(np.linalg.det(np.dot(A.T, z * A))) - kappa * np.sum(np.log(z) + np.log(1.0 - z))
 
     # Optimization loop!
     for i in range(0, maxiter) :
-        Z = _diag(z)
-        W = np.linalg.inv(A.T * Z * A)
-        V = A * W * A.T
-        vo = np.matrix(np.diag(V))
-        vo = vo.T
+        W = np.linalg.inv(np.dot(A.T, z * A))
+        V = np.dot(np.dot(A, W), A.T)
+        vo = np.diag(V).reshape(m, 1)
 
         # define some z operations
         one_by_z = ones_m / z
@@ -91,10 +124,10 @@ def get_newton_determinant_maximization(Ao, number_of_subsamples):
         one_by_z2 = ones_m / z**2
         one_by_one_minus_z2 = ones_m / (ones_m - z)**2
         g = -vo- kappa * (one_by_z - one_by_one_minus_z)
-        H = np.multiply(V, V) + kappa * _diag( one_by_z2 + one_by_one_minus_z2)
+        H = np.multiply(V, V) + kappa * np.diag( (one_by_z2 + one_by_one_minus_z2).ravel() )
 
         # Textbook Newton's method -- compute inverse of Hessian
-        R = np.matrix(cholesky(H) )
+        R = cholesky(H)
         u = lstsq(R.T, g)
         Hinvg = lstsq(R, u[0])
         Hinvg = Hinvg[0]
@@ -108,21 +141,20 @@ def get_newton_determinant_maximization(Ao, number_of_subsamples):
         inczi = _indices(dz, lambda x: x > 0)
         a1 = 0.99* -z[deczi, 0] / dz[deczi, 0]
         a2 = (1 - z[inczi, 0] )/dz[inczi, 0]
-        s = np.min(np.vstack([1.0, np.vstack(a1), np.vstack(a2) ] )  )
+        s = np.min(np.concatenate([[1.0], a1, a2]))
         flag = 1
 
         while flag == 1:
             zp = z + s*dz
-            Zp = _diag(zp)
-            fzp = -np.log(np.linalg.det(A.T * Zp * A) ) - kappa * np.sum(np.log(zp) + np.log(1 - zp)  )
-            const = fz + alpha * s * g.T * dz
+            fzp = -np.log(np.linalg.det(np.dot(A.T, zp * A)) ) - kappa * np.sum(np.log(zp) + np.log(1 - zp)  )
+            const = fz + alpha * s * np.dot(g.T, dz)
             if fzp <= const[0,0]:
                 flag = 2
             if flag != 2:
                 s = beta * s
         z = zp
         fz = fzp
-        sig = -g.T * dz * 0.5
+        sig = -np.dot(g.T, dz) * 0.5
         if( sig[0,0] <= n_tol):
             break
         zsort = np.sort(z, axis=0)
@@ -132,11 +164,6 @@ def get_newton_determinant_maximization(Ao, number_of_subsamples):
     zsort = np.sort(z, axis=0)
     thres = zsort[m - number_of_subsamples - 1]
     zhat, not_used = _find(z, thres)
-    p, q = zhat.shape
-    Zhat = _diag(zhat)
-    L = np.log(np.linalg.det(A.T * Zhat  * A))
-    ztilde  = z
-    Utilde = np.log(np.linalg.det(A.T * _diag(z) * A))  + 2 * m * kappa
     z = _binary2indices(zhat)
     return z
 def _binary2indices(zhat):
@@ -151,12 +178,6 @@ def _binary2indices(zhat):
     return pvec
 def _indices(a, func):
     return [i for (i, val) in enumerate(a) if func(val)]
-def _diag(vec):
-    m = len(vec)
-    D = np.zeros((m, m))
-    for i in range(0, m):
-        D[i,i] = vec[i,0]
-    return D
 def _find(vec, thres):
     t = []
     vec_new = []
@@ -166,6 +187,5 @@ def _find(vec, thres):
             vec_new.append(1.0)
         else:
             vec_new.append(0.0)
-    vec_new = np.matrix(vec_new)
-    vec_new = vec_new.T
+    vec_new = np.array(vec_new).reshape(len(vec_new), 1)
     return vec_new, t
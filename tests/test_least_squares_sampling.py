@@ -30,6 +30,21 @@ class TestC(TestCase):
         PolyApprox2 = myPoly2.get_polyfit( samples )
         PolyApprox2 = np.reshape(PolyApprox2, (N, N))
         np.testing.assert_array_almost_equal(PolyApprox1, PolyApprox2, decimal=7, err_msg='Problem!')
+    def test_randomized_qr(self):
+        np.random.seed(1)
+        params = Parameter(distribution='uniform', order=5, lower=-1.0, upper=1.0)
+        myBasis = Basis('total-order')
+        myPoly = Poly([params, params, params], myBasis, method='least-squares', \
+                                                            sampling_args={'mesh':'monte-carlo',
+                                                                'subsampling-algorithm':'randomized-qr',
+                                                                'sampling-ratio':1.4})
+        p, w = myPoly.get_points_and_weights()
+        self.assertEqual(p.shape[0], int(np.round(1.4 * myBasis.cardinality)))
+        self.assertEqual(len(np.unique(p, axis=0)), p.shape[0])
+        P = myPoly.get_poly(p)
+        A = P.T * np.sqrt(w).reshape(-1, 1)
+        cond_number = np.linalg.cond(np.dot(A.T, A))
+        np.testing.assert_array_less(cond_number, 200.0)
     def test_newton_svd(self):
         zeta_1 = Parameter(distribution='uniform', order=4, lower= -2.0, upper=2.0)
         zeta_2 = Parameter(distribution='uniform', order=4, lower=-1.0, upper=3.0)
@@ -69,5 +84,14 @@ class TestC(TestCase):
         G3 = np.dot(A3.T, A3)
         cond_number = np.linalg.cond(G3)
         np.testing.assert_array_less(cond_number, 200.0)
+    def test_least_squares_rank_deficient(self):
+        # The total-order basis reaches order 4 in every dimension, so on this tensor grid some of its columns vanish.
+        params = [Parameter(distribution='uniform', order=3, lower=-1.0, upper=1.0), \
+                  Parameter(distribution='gaussian', order=2, shape_parameter_A=0.0, shape_parameter_B=1.0), \
+                  Parameter(distribution='uniform', order=4, lower=2.0, upper=5.0)]
+        myPoly = Poly(params, Basis('total-order'), method='least-squares', sampling_args={'mesh':'tensor-grid'})
+        myPoly.set_model(lambda x: np.exp(0.3 * x[0] + 0.5 * x[1]) * np.cos(x[2]))
+        np.testing.assert_array_less(np.max(np.abs(myPoly.get_coefficients())), 1.0)
+        np.testing.assert_almost_equal(myPoly.get_polyfit(np.array([[0.2, -0.4, 3.0]]))[0, 0], -0.85, decimal=1, err_msg='Problem!')
 if __name__== '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,104 @@
+from unittest import TestCase
+import unittest
+from equadratures import *
+import equadratures.poly
+import numpy as np
+
+class TestC(TestCase):
+
+    def test_get_poly_batched(self):
+        np.random.seed(1)
+        params = Parameter(distribution='uniform', order=3, lower=-1.0, upper=1.0)
+        myPoly = Poly([params, params, params], Basis('total-order'))
+        X = np.random.uniform(-1.0, 1.0, (10000, 3))
+        np.testing.assert_array_almost_equal(myPoly.get_poly_batched(X, n_workers=3), myPoly.get_poly(X), decimal=12, err_msg='Problem!')
+    def test_compile_polyfit(self):
+        np.random.seed(1)
+        params = Parameter(distribution='uniform', order=4, lower=-1.0, upper=1.0)
+        myPoly = Poly([params, params, params], Basis('total-order'), method='least-squares', \
+                      sampling_args={'mesh':'monte-carlo', 'subsampling-algorithm':'qr', 'sampling-ratio':1.5})
+        myPoly.set_model(lambda x: np.exp(x[0] + 0.5 * x[1]) * np.sin(x[2]))
+        X = np.random.uniform(-1.0, 1.0, (50, 3))
+        np.testing.assert_array_almost_equal(myPoly.compile_polyfit()(X), myPoly.get_polyfit(X), decimal=10, err_msg='Problem!')
+        myPoly1 = Poly(Parameter(distribution='gaussian', order=5, shape_parameter_A=0.5, shape_parameter_B=2.0), \
+                       Basis('univariate'), method='numerical-integration')
+        myPoly1.set_model(lambda x: np.cos(x[0]))
+        x = np.random.randn(20)
+        np.testing.assert_array_almost_equal(myPoly1.compile_polyfit()(x), myPoly1.get_polyfit(x.reshape(20, 1)), decimal=10, err_msg='Problem!')
+    def test_polyfit_tensor(self):
+        np.random.seed(1)
+        params = [Parameter(distribution='uniform', order=3, lower=-1.0, upper=1.0), \
+                  Parameter(distribution='uniform', order=5, lower=0.0, upper=2.0)]
+        myPoly = Poly(params, Basis('tensor-grid'), method='numerical-integration')
+        myPoly.set_model(lambda x: np.exp(x[0] * x[1]))
+        X = np.column_stack([np.random.uniform(-1.0, 1.0, 40), np.random.uniform(0.0, 2.0, 40)])
+        dense = np.dot(myPoly.get_poly(X).T, myPoly.get_coefficients())
+        np.testing.assert_array_almost_equal(myPoly._get_polyfit_tensor(X), dense, decimal=12, err_msg='Problem!')
+    def test_vectorised_model_evaluations(self):
+        np.random.seed(1)
+        X = np.random.uniform(-1.0, 1.0, (25, 2))
+        fun = lambda x: np.exp(x[0] + 2.0 * x[1])
+        fun_vectorised = lambda x: np.exp(x[:,0] + 2.0 * x[:,1])
+        grad = lambda x: [np.exp(x[0] + 2.0 * x[1]), 2.0 * np.exp(x[0] + 2.0 * x[1])]
+        grad_vectorised = lambda x: np.column_stack([np.exp(x[:,0] + 2.0 * x[:,1]), 2.0 * np.exp(x[:,0] + 2.0 * x[:,1])])
+        np.testing.assert_array_almost_equal(evaluate_model(X, fun_vectorised, vectorised=True), evaluate_model(X, fun), decimal=12, err_msg='Problem!')
+        for format in ['matrix', 'vector']:
+            np.testing.assert_array_almost_equal(evaluate_model_gradients(X, grad_vectorised, format, vectorised=True), \
+                evaluate_model_gradients(X, grad, format), decimal=12, err_msg='Problem!')
+        self.assertEqual(evaluate_model_gradients(X, grad, 'vector').shape, (50, 1))
+        with self.assertRaises(ValueError):
+            evaluate_model_gradients(X, grad, 'list')
+        with self.assertRaises(ValueError):
+            evaluate_model_gradients(X, fun_vectorised, 'matrix', vectorised=True)
+    def test_hessian_kernel(self):
+        np.random.seed(1)
+        params = [Parameter(distribution='uniform', order=4, lower=-1.0, upper=1.0), \
+                  Parameter(distribution='gaussian', order=3, shape_parameter_A=0.0, shape_parameter_B=1.0), \
+                  Parameter(distribution='uniform', order=2, lower=0.0, upper=2.0)]
+        myPoly = Poly(params, Basis('total-order'))
+        X = np.column_stack([np.random.uniform(-1.0, 1.0, 15), np.random.randn(15), np.random.uniform(0.0, 2.0, 15)])
+        basis, basis_max = myPoly._get_basis_int()
+        P = np.zeros((3, int(basis_max.max()) + 2, 15))
+        DP = np.zeros_like(P)
+        D2P = np.zeros_like(P)
+        for i in range(0, 3):
+            p, dp, d2p = params[i]._get_orthogonal_polynomial(X[:,i], int(basis_max[i]) + 1)
+            P[i, 0:p.shape[0]], DP[i, 0:p.shape[0]], D2P[i, 0:p.shape[0]] = p, dp, d2p
+        H_vectorised = np.zeros((3, 3, basis.shape[0], 15))
+        equadratures.poly._get_poly_hess_vectorised(P, DP, D2P, basis, H_vectorised)
+        # Finite differences of the basis gradients check the vectorised path.
+        e = 1e-6
+        for v in range(0, 3):
+            X_step = X.copy()
+            X_step[:, v] += e
+            dH = (myPoly.get_poly_grad(X_step) - myPoly.get_poly_grad(X)) / e
+            for w in range(0, v + 1):
+                np.testing.assert_allclose(H_vectorised[w, v], dH[w], rtol=1e-4, atol=1e-3, err_msg='Problem!')
+        kernel = equadratures.poly._get_compiled_kernel(equadratures.poly._get_poly_hess_kernel, \
+                                                        equadratures.poly.POLY_HESS_KERNEL_SIGNATURE)
+        if kernel is None:
+            self.skipTest('numba is not avaliable.')
+        H_kernel = np.zeros((3, 3, basis.shape[0], 15))
+        kernel(P, DP, D2P, basis.astype(np.int64), H_kernel)
+        np.testing.assert_array_almost_equal(H_kernel, H_vectorised, decimal=10, err_msg='Problem!')
+    def test_batch_get_orthogonal_polynomial(self):
+        np.random.seed(1)
+        params = [Parameter(distribution='uniform', order=3, lower=-1.0, upper=1.0), \
+                  Parameter(distribution='gaussian', order=5, shape_parameter_A=0.5, shape_parameter_B=2.0), \
+                  Parameter(distribution='beta', order=2, lower=0.0, upper=1.0, shape_parameter_A=2.0, shape_parameter_B=3.0)]
+        orders = [3, 5, 2]
+        X = np.column_stack([np.random.uniform(-1.0, 1.0, 12), np.random.randn(12), np.random.rand(12)])
+        P, DP, D2P = Parameter.batch_get_orthogonal_polynomial(params, X, orders, derivative_order=2)
+        for i in range(0, 3):
+            p, dp, d2p = params[i]._get_orthogonal_polynomial(X[:,i], orders[i])
+            np.testing.assert_array_almost_equal(P[i, 0:orders[i] + 1], p, decimal=12, err_msg='Problem!')
+            np.testing.assert_array_almost_equal(DP[i, 0:orders[i] + 1], dp, decimal=12, err_msg='Problem!')
+            np.testing.assert_array_almost_equal(D2P[i, 0:orders[i] + 1], d2p, decimal=12, err_msg='Problem!')
+        # Orthonormal Legendre polynomials for the uniform parameter.
+        x = X[:,0]
+        np.testing.assert_array_almost_equal(P[0, 1], np.sqrt(3.0) * x, decimal=12, err_msg='Problem!')
+        np.testing.assert_array_almost_equal(P[0, 2], np.sqrt(5.0) * 0.5 * (3.0 * x**2 - 1.0), decimal=12, err_msg='Problem!')
+        np.testing.assert_array_almost_equal(D2P[0, 2], np.sqrt(5.0) * 3.0 * np.ones(12), decimal=12, err_msg='Problem!')
+
+if __name__== '__main__':
+    unittest.main()